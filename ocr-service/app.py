@@ -1,19 +1,21 @@
 """
 FastAPI application for OCR service
 """
-from fastapi import FastAPI, File, UploadFile, HTTPException
+from fastapi import FastAPI, File, UploadFile, HTTPException, Response
 from fastapi.middleware.cors import CORSMiddleware
-from PIL import Image
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from typing import Any, AsyncIterator, Callable, Optional
+import asyncio
 import io
 import logging
+import multiprocessing
+import xxhash
 
 from config import config
-from models.schemas import ProcessResponse, HealthResponse, ExtractedData
-from services.image_processor import preprocess_image
-from services.ocr_engine import OCREngine
-from services.document_classifier import DocumentClassifier
-from services.document_parser import DocumentParser
-from utils.image_utils import correct_orientation, resize_image
+from models.schemas import ProcessResponse, HealthResponse
+from services import pipeline
+from utils.result_cache import ResultCache
 
 # Configure logging
 logging.basicConfig(
@@ -33,28 +35,117 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
-# Initialize services
-ocr_engine = OCREngine(
-    tesseract_cmd=config.TESSERACT_CMD,
-    lang=config.TESSERACT_LANG
-)
-classifier = DocumentClassifier()
-parser = DocumentParser()
+def _create_executor() -> ProcessPoolExecutor:
+    """
+    OCR runs in a pool of worker processes so it does not block the event loop.
+    Workers are spawned rather than forked so they start with a clean OpenCV state.
+    """
+    return ProcessPoolExecutor(
+        max_workers=config.OCR_WORKERS,
+        mp_context=multiprocessing.get_context('spawn'),
+        initializer=pipeline.init_worker
+    )
 
-@app.get("/health", response_model=HealthResponse)
-async def health_check():
-    """Health check endpoint"""
+executor = _create_executor()
+
+# Last result of running Tesseract in the worker pool
+tesseract_available = False
+tesseract_check: Optional[asyncio.Task] = None
+
+# Processing is deterministic for a given upload, so results are cached by content hash
+result_cache = ResultCache(maxsize=config.RESULT_CACHE_SIZE)
+
+UPLOAD_CHUNK_SIZE = 64 * 1024
+
+async def _iter_chunks(file: UploadFile, chunk_size: int) -> AsyncIterator[bytes]:
+    """Yield an upload in fixed-size chunks"""
+    while chunk := await file.read(chunk_size):
+        yield chunk
+
+def _replace_executor(broken: ProcessPoolExecutor) -> None:
+    """Swap a broken pool (a worker died) for a fresh one, once per breakage"""
+    global executor
+    if executor is broken:
+        logger.error("OCR worker pool is broken, starting new workers")
+        broken.shutdown(wait=False, cancel_futures=True)
+        executor = _create_executor()
+
+async def _run_in_pool(func: Callable[..., Any], *args: Any) -> Any:
+    """
+    Run func in the worker pool
+    If a worker dies (OOM killer, crash in libtesseract) the pool is replaced
+    and the call retried once; a second failure is raised to the caller
+    """
+    loop = asyncio.get_running_loop()
+    for attempt in range(2):
+        pool = executor
+        try:
+            return await loop.run_in_executor(pool, func, *args)
+        except BrokenProcessPool:
+            _replace_executor(pool)
+            if attempt:
+                raise
+
+def _pool_is_usable() -> bool:
+    """
+    Check the worker pool without waiting behind queued jobs
+    A broken pool rejects new work immediately; it is replaced so the next
+    request gets fresh workers
+    """
+    pool = executor
+    try:
+        pool.submit(int).cancel()
+    except BrokenProcessPool:
+        _replace_executor(pool)
+        return False
+    return True
+
+async def _check_tesseract() -> None:
+    """Run the Tesseract test in the pool and record the result"""
+    global tesseract_available
     try:
-        # Test Tesseract availability
-        test_image = Image.new('RGB', (100, 100), color='white')
-        ocr_engine.extract_text(test_image)
+        await _run_in_pool(pipeline.check_tesseract)
         tesseract_available = True
+    except BrokenProcessPool as e:
+        # Worker crashes are reported through the pool status instead
+        logger.warning(f"Tesseract test interrupted: {e}")
     except Exception as e:
         logger.warning(f"Tesseract test failed: {e}")
         tesseract_available = False
+
+@app.on_event("startup")
+async def warm_workers():
+    """
+    Start every OCR worker before the first request
+    Each worker warms itself up in its initializer
+    """
+    await asyncio.gather(*(_check_tesseract() for _ in range(config.OCR_WORKERS)))
+
+@app.on_event("shutdown")
+def shutdown_executor():
+    """Stop the OCR worker processes"""
+    executor.shutdown(cancel_futures=True)
+
+@app.get("/health", response_model=HealthResponse)
+async def health_check(response: Response):
+    """
+    Health check endpoint
+    Answers without queueing behind OCR jobs: Tesseract is re-tested in the
+    background and the last result reported. Returns 503 if the worker pool
+    was found broken.
+    """
+    global tesseract_check
+    
+    pool_usable = _pool_is_usable()
+    if not pool_usable:
+        response.status_code = 503
+    
+    # Test Tesseract availability, one check at a time
+    if tesseract_check is None or tesseract_check.done():
+        tesseract_check = asyncio.create_task(_check_tesseract())
     
     return HealthResponse(
-        status="healthy",
+        status="healthy" if pool_usable else "unhealthy",
         version="1.0.0",
         tesseract_available=tesseract_available
     )
@@ -72,52 +163,33 @@ async def process_document(file: UploadFile = File(...)):
                 detail=f"Unsupported file type: {file.content_type}. Supported: {config.SUPPORTED_FORMATS}"
             )
         
-        # Read file
-        file_bytes = await file.read()
-        
-        # Validate file size
-        if len(file_bytes) > config.MAX_IMAGE_SIZE:
-            raise HTTPException(
-                status_code=400,
-                detail=f"File too large. Maximum size: {config.MAX_IMAGE_SIZE} bytes"
-            )
-        
-        # Correct orientation
-        image = correct_orientation(file_bytes)
-        
-        # Resize if too large
-        image = resize_image(image, max_dimension=2000)
-        
-        # Preprocess image for better OCR
-        processed_image = preprocess_image(image)
-        
-        # Extract text with confidence
-        ocr_result = ocr_engine.extract_with_confidence(processed_image)
-        
-        if not ocr_result['text'] or ocr_result['confidence'] < 0.1:
-            return ProcessResponse(
-                success=False,
-                confidence=ocr_result['confidence'],
-                document_type='unknown',
-                extracted_data=ExtractedData(),
-                raw_text=ocr_result['text'],
-                error="No text detected in image or confidence too low"
-            )
+        # Validate file size, up front when the size is already known
+        too_large = HTTPException(
+            status_code=400,
+            detail=f"File too large. Maximum size: {config.MAX_IMAGE_SIZE} bytes"
+        )
+        if file.size is not None and file.size > config.MAX_IMAGE_SIZE:
+            raise too_large
         
-        # Classify document type
-        document_type = classifier.classify(ocr_result['text'])
+        # Read file in chunks, stopping as soon as it exceeds the limit
+        image_file = io.BytesIO()
+        async for chunk in _iter_chunks(file, UPLOAD_CHUNK_SIZE):
+            if image_file.tell() + len(chunk) > config.MAX_IMAGE_SIZE:
+                raise too_large
+            image_file.write(chunk)
+        image_file.seek(0)
         
-        # Parse extracted data
-        extracted_data_dict = parser.parse(ocr_result['text'], document_type)
-        extracted_data = ExtractedData(**extracted_data_dict)
+        # Return the earlier result if this exact file was already processed
+        with image_file.getbuffer() as file_view:
+            cache_key = (xxhash.xxh3_128_intdigest(file_view), file.content_type)
+        cached = result_cache.get(cache_key)
+        if cached is not None:
+            return ProcessResponse.model_validate(cached)
         
-        return ProcessResponse(
-            success=True,
-            confidence=ocr_result['confidence'],
-            document_type=document_type,
-            extracted_data=extracted_data,
-            raw_text=ocr_result['text']
-        )
+        # Orient, preprocess, OCR and parse in a worker process
+        result = await _run_in_pool(pipeline.process_document_file, image_file)
+        result_cache.put(cache_key, result.model_dump())
+        return result
     
     except HTTPException:
         raise
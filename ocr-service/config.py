@@ -4,6 +4,14 @@ Configuration for OCR service
 import os
 from typing import Optional
 
+def _available_cpus() -> int:
+    """CPUs this process may run on, honouring container CPU affinity"""
+    try:
+        return len(os.sched_getaffinity(0))
+    except AttributeError:
+        # Not available on macOS/Windows
+        return os.cpu_count() or 1
+
 class Config:
     """Application configuration"""
     
@@ -14,15 +22,32 @@ class Config:
     # Tesseract settings
     TESSERACT_CMD: Optional[str] = os.getenv('TESSERACT_CMD', '/usr/bin/tesseract')
     TESSERACT_LANG: str = os.getenv('TESSERACT_LANG', 'eng')
+    # OpenMP threads per Tesseract call; parallelism comes from the worker pool instead
+    TESSERACT_OMP_THREADS: int = int(os.getenv('TESSERACT_OMP_THREADS', os.getenv('OMP_THREAD_LIMIT', '1')))
     
     # Image processing settings
     MAX_IMAGE_SIZE: int = int(os.getenv('MAX_IMAGE_SIZE', '10485760'))  # 10MB
     SUPPORTED_FORMATS: list = ['image/jpeg', 'image/png', 'image/webp', 'image/tiff']
+    # Median blur + mean threshold instead of non-local means denoising; set to false to revert
+    FAST_PREPROCESS: bool = os.getenv('FAST_PREPROCESS', 'true').lower() == 'true'
+    # Parallel Numba kernels for CLAHE and the mean threshold; needs numba, pays off on multi-core hosts.
+    # Each of the OCR_WORKERS processes runs its kernels on NUMBA_THREADS threads.
+    NUMBA_PREPROCESS: bool = os.getenv('NUMBA_PREPROCESS', 'false').lower() == 'true'
     
     # Processing settings
     PROCESSING_TIMEOUT: int = int(os.getenv('PROCESSING_TIMEOUT', '300'))  # 5 minutes
+    # OCR worker processes, roughly 150 MB each once warm; defaults to one per
+    # available core, capped so large hosts do not spawn dozens at startup
+    OCR_WORKERS: int = int(os.getenv('OCR_WORKERS', str(min(4, max(1, _available_cpus() // TESSERACT_OMP_THREADS)))))
+    # Numba threads per worker; the default splits the cores between workers rather than giving each all of them
+    NUMBA_THREADS: int = int(os.getenv('NUMBA_THREADS', str(max(1, _available_cpus() // OCR_WORKERS))))
+    TEXT_CACHE_SIZE: int = int(os.getenv('TEXT_CACHE_SIZE', '1024'))  # Cached classify/parse results
+    RESULT_CACHE_SIZE: int = int(os.getenv('RESULT_CACHE_SIZE', '256'))  # Cached responses per upload; 0 disables
     
     # Logging
     LOG_LEVEL: str = os.getenv('LOG_LEVEL', 'INFO')
 
 config = Config()
+
+# Must be set before Tesseract/OpenCV start their OpenMP runtimes
+os.environ['OMP_THREAD_LIMIT'] = str(config.TESSERACT_OMP_THREADS)
@@ -2,8 +2,64 @@
 Document type classification
 Determines if document is invoice, receipt, PO, bill, etc.
 """
+import logging
 import re
-from typing import Optional
+import threading
+from typing import Optional, Dict, List
+
+import ahocorasick
+
+try:
+    import hyperscan
+except ImportError:  # Optional; fall back to the pure-Python matcher
+    hyperscan = None
+
+logger = logging.getLogger(__name__)
+
+def _build_automaton(keyword_lists: Dict[str, List[str]]) -> ahocorasick.Automaton:
+    """
+    Build one automaton over all keyword lists so a single pass
+    over the text finds every keyword of every document type
+    """
+    automaton = ahocorasick.Automaton()
+    for document_type, keywords in keyword_lists.items():
+        for keyword in keywords:
+            automaton.add_word(keyword, (document_type, keyword))
+    automaton.make_automaton()
+    return automaton
+
+def _build_database(keyword_lists: Dict[str, List[str]], number_patterns: Dict[str, str]):
+    """
+    Compile every keyword and document number pattern into one Hyperscan
+    database. Returns the database and, per expression id, the document
+    type it scores for and its weight; the database is None if Hyperscan
+    is unavailable or cannot compile on this CPU.
+    """
+    if hyperscan is None:
+        return None, []
+    
+    expressions = []
+    targets = []
+    for document_type, keywords in keyword_lists.items():
+        for keyword in keywords:
+            expressions.append(re.escape(keyword).encode())
+            targets.append((document_type, 1))
+    for document_type, pattern in number_patterns.items():
+        expressions.append(pattern.encode())
+        targets.append((document_type, 2))
+    
+    try:
+        database = hyperscan.Database()
+        database.compile(
+            expressions=expressions,
+            ids=list(range(len(expressions))),
+            elements=len(expressions),
+            flags=hyperscan.HS_FLAG_CASELESS | hyperscan.HS_FLAG_SINGLEMATCH
+        )
+    except hyperscan.error as e:
+        logger.warning(f"Hyperscan unavailable, using pure-Python classifier: {e}")
+        return None, []
+    return database, targets
 
 class DocumentClassifier:
     """Classify document type based on extracted text"""
@@ -29,39 +85,80 @@ class DocumentClassifier:
         'current charges', 'amount owed'
     ]
     
+    # Document number patterns for each type
+    DOCUMENT_NUMBER_PATTERNS = {
+        'invoice': r'inv[#\s]*[\d-]+',
+        'receipt': r'receipt[#\s]*[\d-]+',
+        'purchase_order': r'po[#\s]*[\d-]+|p\.o\.\s*[\d-]+',
+        'bill': r'bill[#\s]*[\d-]+',
+    }
+    
+    _KEYWORD_LISTS = {
+        'invoice': INVOICE_KEYWORDS,
+        'receipt': RECEIPT_KEYWORDS,
+        'purchase_order': PO_KEYWORDS,
+        'bill': BILL_KEYWORDS,
+    }
+    
+    _DOCUMENT_NUMBER_RE = re.compile('|'.join(
+        f'(?P<{document_type}>{pattern})'
+        for document_type, pattern in DOCUMENT_NUMBER_PATTERNS.items()
+    ))
+    _AUTOMATON = _build_automaton(_KEYWORD_LISTS)
+    _HS_DATABASE, _HS_TARGETS = _build_database(_KEYWORD_LISTS, DOCUMENT_NUMBER_PATTERNS)
+    
+    # Hyperscan scratch space must not be shared between threads
+    _hs_local = threading.local()
+    
     def classify(self, text: str) -> str:
         """
         Classify document type based on text content
         Returns: 'invoice', 'receipt', 'purchase_order', 'bill', or 'unknown'
         """
-        text_lower = text.lower()
-        
-        # Count keyword matches for each type
-        invoice_score = sum(1 for keyword in self.INVOICE_KEYWORDS if keyword in text_lower)
-        receipt_score = sum(1 for keyword in self.RECEIPT_KEYWORDS if keyword in text_lower)
-        po_score = sum(1 for keyword in self.PO_KEYWORDS if keyword in text_lower)
-        bill_score = sum(1 for keyword in self.BILL_KEYWORDS if keyword in text_lower)
-        
-        # Also check for document number patterns
-        if re.search(r'inv[#\s]*[\d-]+', text_lower):
-            invoice_score += 2
-        if re.search(r'po[#\s]*[\d-]+', text_lower) or re.search(r'p\.o\.\s*[\d-]+', text_lower):
-            po_score += 2
-        if re.search(r'receipt[#\s]*[\d-]+', text_lower):
-            receipt_score += 2
-        if re.search(r'bill[#\s]*[\d-]+', text_lower):
-            bill_score += 2
-        
-        # Return type with highest score
         scores = {
-            'invoice': invoice_score,
-            'receipt': receipt_score,
-            'purchase_order': po_score,
-            'bill': bill_score
+            'invoice': 0,
+            'receipt': 0,
+            'purchase_order': 0,
+            'bill': 0
         }
         
+        if self._HS_DATABASE is not None:
+            self._score_hyperscan(text, scores)
+        else:
+            self._score_python(text, scores)
+        
+        # Return type with highest score
         max_score = max(scores.values())
         if max_score > 0:
             return max(scores, key=scores.get)
         
         return 'unknown'
+    
+    def _score_hyperscan(self, text: str, scores: Dict[str, int]) -> None:
+        """Score all keywords and patterns in a single Hyperscan pass"""
+        scratch = getattr(self._hs_local, 'scratch', None)
+        if scratch is None:
+            scratch = self._hs_local.scratch = hyperscan.Scratch(self._HS_DATABASE)
+        
+        def on_match(expression_id, start, end, flags, context):
+            document_type, weight = self._HS_TARGETS[expression_id]
+            scores[document_type] += weight
+        
+        self._HS_DATABASE.scan(text.encode(), match_event_handler=on_match, scratch=scratch)
+    
+    def _score_python(self, text: str, scores: Dict[str, int]) -> None:
+        """Score keywords and patterns without Hyperscan"""
+        text_lower = text.lower()
+        
+        # Count keyword matches for each type (each keyword counts once)
+        for document_type, _ in {value for _, value in self._AUTOMATON.iter(text_lower)}:
+            scores[document_type] += 1
+        
+        # Also check for document number patterns
+        found = set()
+        for match in self._DOCUMENT_NUMBER_RE.finditer(text_lower):
+            found.add(match.lastgroup)
+            if len(found) == len(scores):
+                break
+        for document_type in found:
+            scores[document_type] += 2
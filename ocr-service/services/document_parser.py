@@ -10,41 +10,77 @@ from dateutil import parser as date_parser
 class DocumentParser:
     """Parse extracted OCR text into structured data"""
     
-    def __init__(self):
-        self.amount_patterns = [
-            r'total[:\s]*\$?([\d,]+\.?\d*)',
-            r'amount[:\s]*\$?([\d,]+\.?\d*)',
-            r'subtotal[:\s]*\$?([\d,]+\.?\d*)',
-            r'balance[:\s]*\$?([\d,]+\.?\d*)',
-            r'\$([\d,]+\.\d{2})',  # $123.45
-            r'([\d,]+\.\d{2})',    # 123.45
-        ]
-        
-        self.date_patterns = [
-            r'date[:\s]*(\d{1,2}[/-]\d{1,2}[/-]\d{2,4})',
-            r'(\d{1,2}[/-]\d{1,2}[/-]\d{2,4})',
-            r'(\d{4}[/-]\d{1,2}[/-]\d{1,2})',
-        ]
-        
-        self.document_number_patterns = [
-            r'invoice[#\s]*[:]?\s*([A-Z0-9\-]+)',
-            r'inv[#\s]*[:]?\s*([A-Z0-9\-]+)',
-            r'po[#\s]*[:]?\s*([A-Z0-9\-]+)',
-            r'purchase\s+order[#\s]*[:]?\s*([A-Z0-9\-]+)',
-            r'bill[#\s]*[:]?\s*([A-Z0-9\-]+)',
-            r'receipt[#\s]*[:]?\s*([A-Z0-9\-]+)',
-            r'number[:\s]*([A-Z0-9\-]+)',
-        ]
+    AMOUNT_PATTERNS = [
+        r'total[:\s]*\$?([\d,]+\.?\d*)',
+        r'amount[:\s]*\$?([\d,]+\.?\d*)',
+        r'subtotal[:\s]*\$?([\d,]+\.?\d*)',
+        r'balance[:\s]*\$?([\d,]+\.?\d*)',
+        r'\$([\d,]+\.\d{2})',  # $123.45
+        r'([\d,]+\.\d{2})',    # 123.45
+    ]
+    
+    DATE_PATTERNS = [
+        r'date[:\s]*(\d{1,2}[/-]\d{1,2}[/-]\d{2,4})',
+        r'(\d{1,2}[/-]\d{1,2}[/-]\d{2,4})',
+        r'(\d{4}[/-]\d{1,2}[/-]\d{1,2})',
+    ]
+    
+    # Formats for matched dates after '/' is normalized to '-', month-first like dateutil
+    DATE_FORMATS = ['%m-%d-%Y', '%m-%d-%y', '%d-%m-%Y', '%d-%m-%y', '%Y-%m-%d']
+    
+    DOCUMENT_NUMBER_PATTERNS = [
+        r'invoice[#\s]*[:]?\s*([A-Z0-9\-]+)',
+        r'inv[#\s]*[:]?\s*([A-Z0-9\-]+)',
+        r'po[#\s]*[:]?\s*([A-Z0-9\-]+)',
+        r'purchase\s+order[#\s]*[:]?\s*([A-Z0-9\-]+)',
+        r'bill[#\s]*[:]?\s*([A-Z0-9\-]+)',
+        r'receipt[#\s]*[:]?\s*([A-Z0-9\-]+)',
+        r'number[:\s]*([A-Z0-9\-]+)',
+    ]
+    
+    TOTAL_PATTERNS = [
+        r'total[:\s]*\$?([\d,]+\.?\d*)',
+        r'grand\s+total[:\s]*\$?([\d,]+\.?\d*)',
+        r'amount\s+due[:\s]*\$?([\d,]+\.?\d*)',
+    ]
+    
+    TAX_PATTERNS = [
+        r'tax[:\s]*\$?([\d,]+\.?\d*)',
+        r'gst[:\s]*\$?([\d,]+\.?\d*)',
+        r'vat[:\s]*\$?([\d,]+\.?\d*)',
+    ]
+    
+    # Compiled once at class load
+    _DOCUMENT_NUMBER_REGEXES = [re.compile(pattern, re.IGNORECASE) for pattern in DOCUMENT_NUMBER_PATTERNS]
+    _DATE_REGEXES = [re.compile(pattern) for pattern in DATE_PATTERNS]
+    _TOTAL_REGEXES = [re.compile(pattern, re.IGNORECASE) for pattern in TOTAL_PATTERNS]
+    _TAX_REGEXES = [re.compile(pattern, re.IGNORECASE) for pattern in TAX_PATTERNS]
+    _CURRENCY_RE = re.compile(r'\$?([\d,]+\.\d{2})')
+    _FIRST_LINES_RE = re.compile(r'[^\n]*(?:\n[^\n]*){0,9}')
+    # First line (ignoring surrounding whitespace) that looks like a company name:
+    # 4-99 chars containing a company indicator, or 5-50 chars in all caps
+    _VENDOR_RE = re.compile(
+        r'^[^\S\n]*'
+        r'(?:(?=\S[^\n]{2,97}\S[^\S\n]*$)(?=[^\n]*?(?i:inc|ltd|llc|corp|company))'
+        r'|(?=\S[^\n]{3,48}\S[^\S\n]*$)(?=[^\n%(lower)s]*[%(upper)s][^\n%(lower)s]*$))'
+        r'(?P<name>\S(?:[^\n]*\S)?)' % {
+            # Latin-1 cased letters, standing in for str.isupper()
+            'lower': 'a-z\u00b5\u00df-\u00f6\u00f8-\u00ff',
+            'upper': 'A-Z\u00c0-\u00d6\u00d8-\u00de',
+        },
+        re.MULTILINE
+    )
+    _ADDRESS_RE = re.compile(
+        r'(\d+\s+[A-Za-z\s]+(?:Street|St|Avenue|Ave|Road|Rd|Drive|Dr|Lane|Ln|Boulevard|Blvd)[\s,]+[A-Za-z\s,]+(?:\d{5})?)',
+        re.IGNORECASE
+    )
     
     def parse(self, text: str, document_type: str = 'unknown') -> Dict[str, Any]:
         """
         Parse OCR text and extract structured data
         """
-        text_upper = text.upper()
-        text_lower = text.lower()
-        
         extracted = {
-            'document_number': self._extract_document_number(text_upper),
+            'document_number': self._extract_document_number(text),
             'date': self._extract_date(text),
             'amount': self._extract_amount(text),
             'total_amount': self._extract_total_amount(text),
@@ -59,28 +95,38 @@ class DocumentParser:
     
     def _extract_document_number(self, text: str) -> Optional[str]:
         """Extract document number (invoice #, PO #, etc.)"""
-        for pattern in self.document_number_patterns:
-            match = re.search(pattern, text, re.IGNORECASE)
+        # Patterns are case-insensitive; only the match itself is normalized to upper case
+        for pattern in self._DOCUMENT_NUMBER_REGEXES:
+            match = pattern.search(text)
             if match:
-                return match.group(1).strip()
+                return match.group(1).strip().upper()
         return None
     
     def _extract_date(self, text: str) -> Optional[str]:
         """Extract date from document"""
-        for pattern in self.date_patterns:
-            matches = re.findall(pattern, text)
-            if matches:
-                # Try to parse the first valid date
-                for match in matches:
-                    try:
-                        # Try different date formats
-                        date_str = match.replace('/', '-')
-                        parsed_date = date_parser.parse(date_str, fuzzy=True)
-                        return parsed_date.strftime('%Y-%m-%d')
-                    except:
-                        continue
+        for pattern in self._DATE_REGEXES:
+            # Try to parse the first valid date
+            for match in pattern.findall(text):
+                parsed_date = self._parse_date(match.replace('/', '-'))
+                if parsed_date:
+                    return parsed_date
         return None
     
+    def _parse_date(self, date_str: str) -> Optional[str]:
+        """Parse a matched date string into YYYY-MM-DD"""
+        # The date patterns only produce these shapes, so try them directly
+        for date_format in self.DATE_FORMATS:
+            try:
+                return datetime.strptime(date_str, date_format).strftime('%Y-%m-%d')
+            except ValueError:
+                continue
+        
+        # Anything else (e.g. three-digit years) goes to the generic parser
+        try:
+            return date_parser.parse(date_str, fuzzy=True).strftime('%Y-%m-%d')
+        except (ValueError, OverflowError):
+            return None
+    
     def _extract_amount(self, text: str) -> Optional[float]:
         """Extract main amount"""
         amounts = self._extract_all_amounts(text)
@@ -92,14 +138,8 @@ class DocumentParser:
     def _extract_total_amount(self, text: str) -> Optional[float]:
         """Extract total amount"""
         # Look for "total" keyword
-        total_patterns = [
-            r'total[:\s]*\$?([\d,]+\.?\d*)',
-            r'grand\s+total[:\s]*\$?([\d,]+\.?\d*)',
-            r'amount\s+due[:\s]*\$?([\d,]+\.?\d*)',
-        ]
-        
-        for pattern in total_patterns:
-            match = re.search(pattern, text, re.IGNORECASE)
+        for pattern in self._TOTAL_REGEXES:
+            match = pattern.search(text)
             if match:
                 try:
                     amount_str = match.group(1).replace(',', '')
@@ -112,14 +152,8 @@ class DocumentParser:
     
     def _extract_tax_amount(self, text: str) -> Optional[float]:
         """Extract tax amount"""
-        tax_patterns = [
-            r'tax[:\s]*\$?([\d,]+\.?\d*)',
-            r'gst[:\s]*\$?([\d,]+\.?\d*)',
-            r'vat[:\s]*\$?([\d,]+\.?\d*)',
-        ]
-        
-        for pattern in tax_patterns:
-            match = re.search(pattern, text, re.IGNORECASE)
+        for pattern in self._TAX_REGEXES:
+            match = pattern.search(text)
             if match:
                 try:
                     amount_str = match.group(1).replace(',', '')
@@ -133,8 +167,7 @@ class DocumentParser:
         """Extract all monetary amounts from text"""
         amounts = []
         # Pattern for currency amounts
-        pattern = r'\$?([\d,]+\.\d{2})'
-        matches = re.findall(pattern, text)
+        matches = self._CURRENCY_RE.findall(text)
         
         for match in matches:
             try:
@@ -150,35 +183,17 @@ class DocumentParser:
         """Extract vendor/supplier name"""
         # Look for common vendor name indicators
         # Usually appears at the top of the document
-        lines = text.split('\n')[:10]  # Check first 10 lines
-        
-        # Look for lines that might be vendor names
-        # Usually all caps, or company indicators
-        for line in lines:
-            line = line.strip()
-            if len(line) > 3 and len(line) < 100:
-                # Check if it looks like a company name
-                if not re.match(r'^[\d\s\$\.,:]+$', line):  # Not just numbers/symbols
-                    # Check for company indicators
-                    if any(indicator in line.lower() for indicator in ['inc', 'ltd', 'llc', 'corp', 'company']):
-                        return line
-                    # Or if it's in all caps and reasonable length
-                    if line.isupper() and 5 <= len(line) <= 50:
-                        return line
-        
+        end = self._FIRST_LINES_RE.match(text).end()  # Check first 10 lines
+        match = self._VENDOR_RE.search(text, 0, end)
+        if match:
+            return match.group('name')
         return None
     
     def _extract_address(self, text: str) -> Optional[str]:
         """Extract address information"""
-        # Look for address patterns
-        address_patterns = [
-            r'(\d+\s+[A-Za-z\s]+(?:Street|St|Avenue|Ave|Road|Rd|Drive|Dr|Lane|Ln|Boulevard|Blvd)[\s,]+[A-Za-z\s,]+(?:\d{5})?)',
-        ]
-        
-        for pattern in address_patterns:
-            match = re.search(pattern, text, re.IGNORECASE)
-            if match:
-                return match.group(1).strip()
+        match = self._ADDRESS_RE.search(text)
+        if match:
+            return match.group(1).strip()
         
         return None
     
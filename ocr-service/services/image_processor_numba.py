@@ -0,0 +1,127 @@
+"""
+Numba kernels for the CLAHE and adaptive threshold preprocessing steps
+Rows and tiles are spread across the calling thread's Numba threads (see
+set_num_threads); results follow OpenCV's createCLAHE and
+adaptiveThreshold(ADAPTIVE_THRESH_MEAN_C, THRESH_BINARY)
+"""
+import numba
+import numpy as np
+from numba import njit, prange
+
+def set_num_threads(count: int) -> None:
+    """
+    Limit the threads the kernels use when called from this thread
+    Capped at the size of Numba's thread pool
+    """
+    numba.set_num_threads(max(1, min(count, numba.config.NUMBA_NUM_THREADS)))
+
+@njit(parallel=True, fastmath=True, cache=True)
+def adaptive_threshold_mean(gray: np.ndarray, block: int, C: int, out: np.ndarray,
+                            integral: np.ndarray) -> np.ndarray:
+    """
+    Binarize against the mean of each pixel's block x block neighbourhood
+    Pixels brighter than (mean - C) become 255, the rest 0
+    integral is scratch space of shape (height + block, width + block)
+    """
+    height, width = gray.shape
+    radius = block // 2
+    padded_height = height + 2 * radius
+    padded_width = width + 2 * radius
+    
+    # Integral image of the input with a replicated border
+    integral[0, :] = 0
+    integral[:, 0] = 0
+    for py in prange(padded_height):
+        y = min(max(py - radius, 0), height - 1)
+        row_sum = 0
+        for px in range(padded_width):
+            x = min(max(px - radius, 0), width - 1)
+            row_sum += gray[y, x]
+            integral[py + 1, px + 1] = row_sum
+    for py in range(2, padded_height + 1):
+        for px in range(1, padded_width + 1):
+            integral[py, px] += integral[py - 1, px]
+    
+    area = block * block
+    for y in prange(height):
+        for x in range(width):
+            block_sum = (integral[y + block, x + block] - integral[y, x + block]
+                         - integral[y + block, x] + integral[y, x])
+            mean = (block_sum + area // 2) // area
+            out[y, x] = 255 if gray[y, x] + C > mean else 0
+    
+    return out
+
+@njit(parallel=True, fastmath=True, cache=True)
+def clahe(gray: np.ndarray, clip_limit: float, tiles_x: int, tiles_y: int, out: np.ndarray) -> np.ndarray:
+    """
+    Contrast Limited Adaptive Histogram Equalization
+    out may be the same array as gray
+    """
+    height, width = gray.shape
+    # Like OpenCV, an image that does not split evenly is extended with a
+    # reflected border on both axes before it is cut into tiles
+    if height % tiles_y == 0 and width % tiles_x == 0:
+        tile_height = height // tiles_y
+        tile_width = width // tiles_x
+    else:
+        tile_height = (height + tiles_y - height % tiles_y) // tiles_y
+        tile_width = (width + tiles_x - width % tiles_x) // tiles_x
+    tile_area = tile_height * tile_width
+    clip = max(int(clip_limit * tile_area / 256), 1)
+    lut_scale = 255.0 / tile_area
+    
+    # Clipped, equalized lookup table per tile
+    luts = np.empty((tiles_y * tiles_x, 256), np.uint8)
+    for tile in prange(tiles_y * tiles_x):
+        ty = tile // tiles_x
+        tx = tile % tiles_x
+        hist = np.zeros(256, np.int64)
+        for py in range(ty * tile_height, (ty + 1) * tile_height):
+            y = py if py < height else max(2 * (height - 1) - py, 0)
+            for px in range(tx * tile_width, (tx + 1) * tile_width):
+                x = px if px < width else max(2 * (width - 1) - px, 0)
+                hist[gray[y, x]] += 1
+        
+        # Clip the histogram and redistribute the excess evenly
+        clipped = 0
+        for i in range(256):
+            if hist[i] > clip:
+                clipped += hist[i] - clip
+                hist[i] = clip
+        batch = clipped // 256
+        residual = clipped - batch * 256
+        for i in range(256):
+            hist[i] += batch
+        if residual > 0:
+            step = max(256 // residual, 1)
+            i = 0
+            while i < 256 and residual > 0:
+                hist[i] += 1
+                residual -= 1
+                i += step
+        
+        cumulative = 0
+        for i in range(256):
+            cumulative += hist[i]
+            luts[tile, i] = min(int(cumulative * lut_scale + 0.5), 255)
+    
+    # Bilinear interpolation between the four nearest tile centres
+    for y in prange(height):
+        tyf = y / tile_height - 0.5
+        ty1 = int(np.floor(tyf))
+        ya = tyf - ty1
+        ty2 = min(ty1 + 1, tiles_y - 1)
+        ty1 = max(ty1, 0)
+        for x in range(width):
+            txf = x / tile_width - 0.5
+            tx1 = int(np.floor(txf))
+            xa = txf - tx1
+            tx2 = min(tx1 + 1, tiles_x - 1)
+            tx1 = max(tx1, 0)
+            value = gray[y, x]
+            top = luts[ty1 * tiles_x + tx1, value] * (1 - xa) + luts[ty1 * tiles_x + tx2, value] * xa
+            bottom = luts[ty2 * tiles_x + tx1, value] * (1 - xa) + luts[ty2 * tiles_x + tx2, value] * xa
+            out[y, x] = min(int(top * (1 - ya) + bottom * ya + 0.5), 255)
+    
+    return out
@@ -4,8 +4,16 @@ Tesseract OCR wrapper
 import pytesseract
 from PIL import Image
 from typing import Dict, Any
+import logging
 import re
 
+try:
+    import tesserocr
+except ImportError:  # Optional; fall back to the pytesseract CLI wrapper
+    tesserocr = None
+
+logger = logging.getLogger(__name__)
+
 class OCREngine:
     """Wrapper for Tesseract OCR"""
     
@@ -15,6 +23,16 @@ class OCREngine:
         """
         pytesseract.pytesseract.tesseract_cmd = tesseract_cmd
         self.lang = lang
+        
+        # Keep one in-process Tesseract instance for the engine's lifetime so the
+        # language model is loaded once instead of on every CLI call.
+        # Not thread-safe: use one engine per worker process.
+        self.api = None
+        if tesserocr is not None:
+            try:
+                self.api = tesserocr.PyTessBaseAPI(lang=lang)
+            except RuntimeError as e:
+                logger.warning(f"tesserocr unavailable, using pytesseract: {e}")
     
     def extract_text(self, image: Image.Image, config: str = '') -> str:
         """
@@ -22,7 +40,7 @@ class OCREngine:
         """
         try:
             # Default config for better accuracy
-            default_config = '--psm 6 -c tessedit_char_whitelist=0123456789ABCDEFGHIJKLMNOPQRSTUVWXYZabcdefghijklmnopqrstuvwxyz.,$/-:() '
+            default_config = '--psm 6 --oem 1'
             if config:
                 default_config = config
             
@@ -37,24 +55,56 @@ class OCREngine:
         Returns both raw text and detailed data with confidence
         """
         try:
-            # Get detailed data including confidence
-            data = pytesseract.image_to_data(image, lang=self.lang, output_type=pytesseract.Output.DICT)
-            
-            # Extract text
-            text = pytesseract.image_to_string(image, lang=self.lang)
+            if self.api is not None:
+                self.api.SetImage(image)
+                text = self.api.GetUTF8Text().strip()
+                # MapWordConfidences raises when nothing was recognised
+                words = self.api.MapWordConfidences() if text else []
+                data = {
+                    'text': [word for word, _ in words],
+                    'conf': [conf for _, conf in words]
+                }
+            else:
+                # Single Tesseract pass: detailed data including confidence
+                data = pytesseract.image_to_data(image, lang=self.lang, output_type=pytesseract.Output.DICT)
+                
+                # Rebuild the text from the recognised words
+                text = self._text_from_data(data)
             
             # Calculate average confidence (excluding -1 values which indicate non-text)
             confidences = [int(conf) for conf in data['conf'] if int(conf) > 0]
             avg_confidence = sum(confidences) / len(confidences) if confidences else 0
             
             return {
-                'text': text.strip(),
+                'text': text,
                 'confidence': avg_confidence / 100.0,  # Convert to 0-1 scale
                 'detailed_data': data
             }
         except Exception as e:
             raise Exception(f"OCR extraction with confidence failed: {str(e)}")
     
+    def _text_from_data(self, data: Dict[str, list]) -> str:
+        """
+        Join image_to_data words into text laid out like image_to_string:
+        words separated by spaces, lines by newlines, paragraphs by a blank line
+        """
+        paragraphs = []
+        lines = {}
+        for i, word in enumerate(data['text']):
+            word = word.strip()
+            if not word:
+                continue
+            paragraph = (data['block_num'][i], data['par_num'][i])
+            if not paragraphs or paragraphs[-1] != paragraph:
+                paragraphs.append(paragraph)
+                lines[paragraph] = {}
+            lines[paragraph].setdefault(data['line_num'][i], []).append(word)
+        
+        return '\n\n'.join(
+            '\n'.join(' '.join(words) for words in lines[paragraph].values())
+            for paragraph in paragraphs
+        )
+    
     def extract_amounts(self, text: str) -> list:
         """
         Extract monetary amounts from text
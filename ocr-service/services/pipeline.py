@@ -0,0 +1,122 @@
+"""
+Document processing pipeline
+Runs in worker processes so OCR never blocks the API event loop
+"""
+import io
+import os
+import logging
+from functools import lru_cache
+from typing import Dict, Any, Optional, BinaryIO
+from PIL import Image, ImageDraw
+
+from config import config
+from models.schemas import ProcessResponse, ExtractedData
+from services.image_processor import preprocess_image, enable_numba
+from services.ocr_engine import OCREngine
+from services.document_classifier import DocumentClassifier
+from services.document_parser import DocumentParser
+from utils.image_utils import correct_orientation, resize_image
+
+logger = logging.getLogger(__name__)
+
+# Services are created once per worker process by init_worker
+ocr_engine: Optional[OCREngine] = None
+classifier: Optional[DocumentClassifier] = None
+parser: Optional[DocumentParser] = None
+
+def init_worker() -> None:
+    """
+    Initialize a worker process
+    Limits Tesseract's OpenMP and Numba's threads and creates the services it will reuse
+    """
+    global ocr_engine, classifier, parser
+    
+    os.environ['OMP_THREAD_LIMIT'] = str(config.TESSERACT_OMP_THREADS)
+    
+    ocr_engine = OCREngine(
+        tesseract_cmd=config.TESSERACT_CMD,
+        lang=config.TESSERACT_LANG
+    )
+    classifier = DocumentClassifier()
+    parser = DocumentParser()
+    
+    # Workers share the cores instead of each running Numba on all of them
+    if config.NUMBA_PREPROCESS and not enable_numba(config.NUMBA_THREADS):
+        logger.warning("NUMBA_PREPROCESS is enabled but numba is not installed, using OpenCV preprocessing")
+    
+    try:
+        warm_up()
+    except Exception as e:
+        logger.warning(f"Worker warm-up failed: {e}")
+
+# Classification and parsing are pure functions of the OCR text, so repeated
+# uploads of the same document skip straight to the cached result.
+# Cached values are shared between requests and must not be mutated.
+@lru_cache(maxsize=config.TEXT_CACHE_SIZE)
+def _classify_cached(text: str) -> str:
+    return classifier.classify(text)
+
+@lru_cache(maxsize=config.TEXT_CACHE_SIZE)
+def _parse_cached(text: str, document_type: str) -> Dict[str, Any]:
+    return parser.parse(text, document_type)
+
+def warm_up() -> None:
+    """
+    Run the full pipeline on a small generated image
+    Loads Tesseract's language data and compiles OpenCV/Numba kernels
+    before the first real request arrives
+    """
+    # Grey background so the image is not passed through as a clean scan
+    test_image = Image.new('RGB', (200, 60), color=(200, 200, 200))
+    ImageDraw.Draw(test_image).text((10, 20), "Hello 123", fill='black')
+    image_file = io.BytesIO()
+    test_image.save(image_file, format='PNG')
+    image_file.seek(0)
+    process_document_file(image_file)
+
+def check_tesseract() -> None:
+    """Run Tesseract on a blank image; raises if it is unavailable"""
+    test_image = Image.new('RGB', (100, 100), color='white')
+    ocr_engine.extract_with_confidence(test_image)
+
+def process_document_file(image_file: BinaryIO) -> ProcessResponse:
+    """
+    Run the full pipeline on an uploaded image:
+    orient -> resize -> preprocess -> OCR -> classify -> parse
+    """
+    # Correct orientation
+    image = correct_orientation(image_file)
+    
+    # Resize if too large
+    image = resize_image(image, max_dimension=2000)
+    
+    # Preprocess image for better OCR
+    processed_image = preprocess_image(image, fast=config.FAST_PREPROCESS, use_numba=config.NUMBA_PREPROCESS)
+    
+    # Extract text with confidence
+    ocr_result = ocr_engine.extract_with_confidence(processed_image)
+    
+    if not ocr_result['text'] or ocr_result['confidence'] < 0.1:
+        return ProcessResponse(
+            success=False,
+            confidence=ocr_result['confidence'],
+            document_type='unknown',
+            extracted_data=ExtractedData(),
+            raw_text=ocr_result['text'],
+            error="No text detected in image or confidence too low"
+        )
+    
+    # Classify document type
+    document_type = _classify_cached(ocr_result['text'])
+    
+    # Parse extracted data
+    extracted_data_dict = _parse_cached(ocr_result['text'], document_type)
+    extracted_data = ExtractedData(**extracted_data_dict)
+    
+    return ProcessResponse(
+        success=True,
+        confidence=ocr_result['confidence'],
+        document_type=document_type,
+        extracted_data=extracted_data,
+        raw_text=ocr_result['text']
+    )
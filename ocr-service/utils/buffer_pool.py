@@ -0,0 +1,49 @@
+"""
+Reusable numpy buffers for the image pipeline
+Reusing warm buffers avoids page-faulting fresh multi-megabyte allocations on every request
+"""
+import threading
+from contextlib import contextmanager
+from typing import Iterator, List, Tuple
+import numpy as np
+
+class BufferPool:
+    """Pool of flat numpy buffers loaned out as arrays of any shape that fits"""
+    
+    def __init__(self, max_buffers: int = 4):
+        self.max_buffers = max_buffers
+        self._free: List[np.ndarray] = []
+        self._lock = threading.Lock()
+    
+    @contextmanager
+    def get(self, shape: Tuple[int, ...], dtype=np.uint8) -> Iterator[np.ndarray]:
+        """
+        Borrow a contiguous array of the given shape and dtype
+        Contents are uninitialized; the buffer returns to the pool on exit
+        """
+        dtype = np.dtype(dtype)
+        size = int(np.prod(shape))
+        buffer = self._acquire(size, dtype)
+        try:
+            yield buffer[:size].reshape(shape)
+        finally:
+            self._release(buffer)
+    
+    def _acquire(self, size: int, dtype: np.dtype) -> np.ndarray:
+        """Take the smallest free buffer that fits, or allocate a new one"""
+        with self._lock:
+            fits = [i for i, b in enumerate(self._free) if b.dtype == dtype and b.size >= size]
+            if fits:
+                return self._free.pop(min(fits, key=lambda i: self._free[i].size))
+        return np.empty(size, dtype=dtype)
+    
+    def _release(self, buffer: np.ndarray) -> None:
+        """Return a buffer, dropping the smallest one if the pool is full"""
+        with self._lock:
+            self._free.append(buffer)
+            if len(self._free) > self.max_buffers:
+                smallest = min(range(len(self._free)), key=lambda i: self._free[i].nbytes)
+                self._free.pop(smallest)
+
+# Shared by everything running in this process
+buffer_pool = BufferPool()
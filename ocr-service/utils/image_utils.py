@@ -2,42 +2,45 @@
 Image utility functions for preprocessing
 """
 from PIL import Image, ExifTags
+from typing import BinaryIO, Union
+import cv2
+import numpy as np
 import io
 
-def correct_orientation(image_bytes: bytes) -> Image.Image:
+# EXIF orientation values and the transpose that undoes each rotation
+_ORIENTATION_TRANSPOSE = {
+    3: Image.Transpose.ROTATE_180,
+    6: Image.Transpose.ROTATE_270,
+    8: Image.Transpose.ROTATE_90,
+}
+
+def correct_orientation(image_source: Union[bytes, BinaryIO]) -> Image.Image:
     """
     Correct image orientation based on EXIF data
+    Accepts the raw image bytes or a seekable file-like object
     """
+    if isinstance(image_source, bytes):
+        image_source = io.BytesIO(image_source)
+    
     try:
-        image = Image.open(io.BytesIO(image_bytes))
+        image = Image.open(image_source)
         
-        # Check for EXIF orientation
-        if hasattr(image, '_getexif') and image._getexif() is not None:
-            exif = image._getexif()
-            orientation = None
-            
-            for tag, value in ExifTags.TAGS.items():
-                if value == 'Orientation':
-                    orientation = exif.get(tag)
-                    break
-            
-            if orientation:
-                # Rotate image based on orientation
-                if orientation == 3:
-                    image = image.rotate(180, expand=True)
-                elif orientation == 6:
-                    image = image.rotate(270, expand=True)
-                elif orientation == 8:
-                    image = image.rotate(90, expand=True)
+        # Check for EXIF orientation and rotate losslessly
+        orientation = image.getexif().get(ExifTags.Base.Orientation)
+        if orientation in _ORIENTATION_TRANSPOSE:
+            image = image.transpose(_ORIENTATION_TRANSPOSE[orientation])
         
         return image
     except Exception:
         # If EXIF reading fails, return original
-        return Image.open(io.BytesIO(image_bytes))
+        image_source.seek(0)
+        return Image.open(image_source)
 
-def resize_image(image: Image.Image, max_dimension: int = 2000) -> Image.Image:
+def resize_image(image: Image.Image, max_dimension: int = 2000) -> Union[Image.Image, np.ndarray]:
     """
     Resize image if it's too large, maintaining aspect ratio
+    Downscales of 8-bit grayscale/RGB(A) images use OpenCV's area filter and
+    return a numpy array that preprocess_image accepts directly
     """
     width, height = image.size
     
@@ -51,5 +54,7 @@ def resize_image(image: Image.Image, max_dimension: int = 2000) -> Image.Image:
         new_height = max_dimension
         new_width = int(width * (max_dimension / height))
     
+    if image.mode in ('L', 'RGB', 'RGBA'):
+        return cv2.resize(np.asarray(image), (new_width, new_height), interpolation=cv2.INTER_AREA)
+    
     return image.resize((new_width, new_height), Image.Resampling.LANCZOS)
-
@@ -0,0 +1,32 @@
+"""
+In-memory LRU cache for processing results
+"""
+from collections import OrderedDict
+from typing import Any, Hashable, Optional
+
+class ResultCache:
+    """Least-recently-used cache with a fixed number of entries"""
+    
+    def __init__(self, maxsize: int = 256):
+        """
+        Initialize cache
+        A maxsize of 0 disables caching
+        """
+        self.maxsize = maxsize
+        self._entries: OrderedDict = OrderedDict()
+    
+    def get(self, key: Hashable) -> Optional[Any]:
+        """Return the cached value for key, or None"""
+        value = self._entries.get(key)
+        if value is not None:
+            self._entries.move_to_end(key)
+        return value
+    
+    def put(self, key: Hashable, value: Any) -> None:
+        """Store value under key, evicting the least recently used entry if full"""
+        if self.maxsize <= 0:
+            return
+        self._entries[key] = value
+        self._entries.move_to_end(key)
+        if len(self._entries) > self.maxsize:
+            self._entries.popitem(last=False)